@@ -0,0 +1,114 @@
+"""
+Shared helpers for placing source PDF pages onto larger sheets.
+"""
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, FloatObject, IndirectObject, NameObject, RectangleObject
+
+# Form XObjects already added to the writer, keyed by source page object number and clip box
+XObjectCache = Dict[Tuple[int, Tuple[float, ...]], IndirectObject]
+
+# Source page drawn on a writer page: target page index, source page index, translation and clip box
+Placement = Tuple[int, int, float, float, Sequence[float]]
+
+
+@contextmanager
+def open_pdf(src: Path) -> Iterator[PdfReader]:
+    # Memory-map the source so pypdf reads from the page cache instead of
+    # copying the whole file into memory. The reader parses objects from the
+    # map lazily, so the map stays open for the caller's `with` block and is
+    # unmapped when the block exits.
+    if os.path.getsize(src) == 0:
+        # mmap rejects empty files; let pypdf report them as EmptyFileError
+        yield PdfReader(str(src))
+        return
+    with open(src, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield PdfReader(mm)
+
+
+def page_as_form_xobject(writer: PdfWriter, page: PageObject, bbox: Sequence[float]) -> IndirectObject:
+    # Wrap the page as a Form XObject clipped to bbox, so it can be
+    # placed with a single `Do` instead of re-emitting its content stream
+    source = page["/Contents"] if "/Contents" in page else None
+    if isinstance(source, EncodedStreamObject):
+        # Single compressed stream: reuse the encoded bytes as they are
+        # rather than inflating and deflating them again
+        xobj = EncodedStreamObject()
+        xobj._data = source._data
+        for key in ("/Filter", "/DecodeParms"):
+            if key in source:
+                xobj[NameObject(key)] = source.raw_get(key).clone(writer)
+    else:
+        contents = page.get_contents()
+        xobj = DecodedStreamObject()
+        xobj.set_data(contents.get_data() if contents is not None else b"")
+        xobj = xobj.flate_encode()
+
+    xobj[NameObject("/Type")] = NameObject("/XObject")
+    xobj[NameObject("/Subtype")] = NameObject("/Form")
+    xobj[NameObject("/BBox")] = RectangleObject(bbox)
+    if "/Resources" in page:
+        xobj[NameObject("/Resources")] = page.raw_get("/Resources").clone(writer)
+    return writer._add_object(xobj)
+
+
+def cached_form_xobject(writer: PdfWriter, page: PageObject, bbox: Sequence[float], xobject_cache: XObjectCache) -> IndirectObject:
+    # Form XObjects are interned per source page and clip box, so placing the
+    # same page again only costs another `Do` on the target page
+    key = (page.indirect_reference.idnum, tuple(bbox))
+    xobj = xobject_cache.get(key)
+    if xobj is None:
+        xobj = xobject_cache[key] = page_as_form_xobject(writer, page, bbox)
+    return xobj
+
+
+def place_annotations(writer: PdfWriter, target_page: PageObject, page: PageObject, tx: float, ty: float) -> None:
+    # The Form XObject only carries the page's drawing, so links, notes and
+    # form fields are copied onto the target page separately and shifted by
+    # the same translation, as merge_transformed_page used to do
+    if "/Annots" not in page:
+        return
+    if "/Annots" not in target_page:
+        target_page[NameObject("/Annots")] = ArrayObject()
+    annots = target_page["/Annots"]
+
+    for annot in page["/Annots"]:
+        annot = annot.get_object()
+        clone = annot.clone(writer, ignore_fields=("/P", "/StructParent", "/Parent"), force_duplicate=True)
+        x0, y0, x1, y1 = (float(v) for v in annot["/Rect"])
+        clone[NameObject("/Rect")] = RectangleObject((x0 + tx, y0 + ty, x1 + tx, y1 + ty))
+        if "/QuadPoints" in annot:
+            clone[NameObject("/QuadPoints")] = ArrayObject(
+                FloatObject(float(v) + (tx if i % 2 == 0 else ty)) for i, v in enumerate(annot["/QuadPoints"])
+            )
+        if "/Popup" in clone:
+            clone["/Popup"][NameObject("/Parent")] = clone.indirect_reference
+        clone[NameObject("/P")] = target_page.indirect_reference
+        annots.append(clone.indirect_reference)
+
+
+def place_pages(writer: PdfWriter, pages: Sequence[PageObject], placements: Iterable[Placement]) -> None:
+    # Target pages are expected to be blank. Their content streams and XObject
+    # resources are collected first and attached once, in placement order.
+    xobject_cache: XObjectCache = {}
+    contents: Dict[int, bytearray] = {}
+    xobjects: Dict[int, DictionaryObject] = {}
+    for target_idx, page_idx, tx, ty, bbox in placements:
+        xobj = cached_form_xobject(writer, pages[page_idx], bbox, xobject_cache)
+        name = f"/Fm{xobj.idnum}"
+        xobjects.setdefault(target_idx, DictionaryObject())[NameObject(name)] = xobj
+        contents.setdefault(target_idx, bytearray()).extend(f"q 1 0 0 1 {tx:.4f} {ty:.4f} cm {name} Do Q\n".encode())
+        place_annotations(writer, writer.pages[target_idx], pages[page_idx], tx, ty)
+
+    for target_idx, data in contents.items():
+        target_page = writer.pages[target_idx]
+        target_page["/Resources"].setdefault(NameObject("/XObject"), DictionaryObject()).update(xobjects[target_idx])
+
+        content = DecodedStreamObject()
+        content.set_data(bytes(data))
+        target_page[NameObject("/Contents")] = writer._add_object(content.flate_encode())
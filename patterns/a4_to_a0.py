@@ -5,8 +5,14 @@ Convert an A4-tiled sewing pattern into A0 sheets.
 import math
 import sys
 from pathlib import Path
+from typing import List, Tuple
 
-from pypdf import PdfReader, PdfWriter, Transformation
+from pypdf import PdfWriter
+
+try:
+    from ._placement import open_pdf, place_pages
+except ImportError:  # run as a script from this directory
+    from _placement import open_pdf, place_pages
 
 # constants
 MM2PT = 72 / 25.4
@@ -20,32 +26,58 @@ A0_H_PT = A4_expected_h * 4
 MARGIN_MM = 10
 MARGIN_PT = MARGIN_MM * MM2PT
 
-print(A4_expected_w - 2 * MARGIN_PT)
-print(A4_expected_h - 2 * MARGIN_PT)
+# Crop insets of a tile: left, bottom, right, top
+Insets = Tuple[float, float, float, float]
+
+
+def compute_placements(a4_rows: int, a4_cols: int, crop_t_pt: float, crop_b_pt: float, crop_l_pt: float, crop_r_pt: float) -> List[Tuple[int, int, int, Insets]]:
+    # Placement of each tile: target A0 page, offset on that page in tiles from
+    # the bottom left corner, and crop insets (left, bottom, right, top)
+    a0_cols = math.ceil(a4_cols / 4)
+
+    placements = []
+    for idx in range(a4_rows * a4_cols):
+        a4_row, a4_col = divmod(idx, a4_cols)
+        a0_row, a0_col = a4_row // 4, a4_col // 4
+        within_page_row = a4_row % 4
+        within_page_col = a4_col % 4
+
+        crop_left = within_page_col != 0
+        crop_bottom = within_page_row != 3 and a4_row != (a4_rows - 1)  # account for if this is the last row
+        crop_right = within_page_col != 3 and a4_col != (a4_cols - 1)  # account for if this is the last column
+        crop_top = within_page_row != 0
+
+        insets = (
+            crop_l_pt if crop_left else 0,
+            crop_b_pt if crop_bottom else 0,
+            crop_r_pt if crop_right else 0,
+            crop_t_pt if crop_top else 0,
+        )
+        placements.append((a0_row * a0_cols + a0_col, within_page_col, 3 - within_page_row, insets))
+
+    return placements
 
 
 def main(src: Path, dst: Path, a4_rows: int, a4_cols: int, crop_t_mm: float, crop_b_mm: float, crop_l_mm: float, crop_r_mm: float) -> None:
-    reader = PdfReader(str(src))
-    if len(reader.pages) != a4_rows * a4_cols:
-        sys.exit(f"Expected {a4_rows} x {a4_cols} = {a4_rows * a4_cols} pages.")
+    with open_pdf(src) as reader:
+        if len(reader.pages) != a4_rows * a4_cols:
+            sys.exit(f"Expected {a4_rows} x {a4_cols} = {a4_rows * a4_cols} pages.")
+        pages = list(reader.pages)
 
-    a0_rows = math.ceil(a4_rows / 4)
-    a0_cols = math.ceil(a4_cols / 4)
+        a0_rows = math.ceil(a4_rows / 4)
+        a0_cols = math.ceil(a4_cols / 4)
 
-    # Crop amount in mm and points
-    crop_t_pt = crop_t_mm * MM2PT
-    crop_b_pt = crop_b_mm * MM2PT
-    crop_l_pt = crop_l_mm * MM2PT
-    crop_r_pt = crop_r_mm * MM2PT
+        # Crop amount in mm and points
+        crop_t_pt = crop_t_mm * MM2PT
+        crop_b_pt = crop_b_mm * MM2PT
+        crop_l_pt = crop_l_mm * MM2PT
+        crop_r_pt = crop_r_mm * MM2PT
 
-    writer = PdfWriter()
-    for _ in range(a0_rows * a0_cols):
-        writer.add_blank_page(width=A0_W_PT, height=A0_H_PT)
+        placements = compute_placements(a4_rows, a4_cols, crop_t_pt, crop_b_pt, crop_l_pt, crop_r_pt)
 
-    for idx, page in enumerate(reader.pages):
-        # check size
-        tile_w = float(page.mediabox.width)
-        tile_h = float(page.mediabox.height)
+        # check size; all tiles of an exported pattern share the same dimensions
+        tile_w = float(pages[0].mediabox.width)
+        tile_h = float(pages[0].mediabox.height)
 
         print(f"Tile size: {tile_w} x {tile_h}")
 
@@ -55,7 +87,7 @@ def main(src: Path, dst: Path, a4_rows: int, a4_cols: int, crop_t_mm: float, cro
             print("Warning: Original excluded margins")
         else:
             sys.exit(f"Expected tile dimensions to be {A4_expected_w}mm x {A4_expected_h}mm, got {tile_w}mm x {tile_h}mm")
-        
+
         # Cropped tile dimensions
         cropped_tile_w = tile_w - crop_l_pt - crop_r_pt
         cropped_tile_h = tile_h - crop_t_pt - crop_b_pt
@@ -66,73 +98,30 @@ def main(src: Path, dst: Path, a4_rows: int, a4_cols: int, crop_t_mm: float, cro
         if new_w_margin < MARGIN_PT or new_h_margin < MARGIN_PT:
             sys.exit(f"New margins are too small: {new_w_margin}pt x {new_h_margin}pt")
 
-        a4_row, a4_col = divmod(idx, a4_cols)
-        a0_row, a0_col = a4_row // 4, a4_col // 4
-        within_page_row = a4_row % 4
-        within_page_col = a4_col % 4
+        writer = PdfWriter()
+        for _ in range(a0_rows * a0_cols):
+            writer.add_blank_page(width=A0_W_PT, height=A0_H_PT)
 
-        target_page = writer.pages[a0_row * a0_cols + a0_col]
+        tiles = []
+        for page_idx, (page, (a0_idx, col_offset, row_offset, insets)) in enumerate(zip(pages, placements)):
+            lx = new_w_margin + cropped_tile_w * col_offset
+            ly = new_h_margin + cropped_tile_h * row_offset
 
-        if within_page_col == 0:
-            lx = new_w_margin
-            crop_left = False
-        else:
-            lx = new_w_margin + cropped_tile_w * within_page_col
-            crop_left = True
+            # Clip the tile to its crop box instead of mutating the shared mediabox
+            x0, y0, x1, y1 = (float(v) for v in page.mediabox)
+            inset_l, inset_b, inset_r, inset_t = insets
+            bbox = (x0 + inset_l, y0 + inset_b, x1 - inset_r, y1 - inset_t)
 
-        if (within_page_row == 3):
-            ly = new_h_margin
-            crop_bottom = False
-        else:
-            ly = new_h_margin + cropped_tile_h * (3 - within_page_row)
-            crop_bottom = True
-
-        if a4_row == (a4_rows - 1):  # account for if this is the last row
-            crop_bottom = False
-
-        if (within_page_col == 3) or (a4_col == (a4_cols - 1)):  # account for if this is the last column
-            crop_right = False
-        else:
-            crop_right = True
+            tiles.append((a0_idx, page_idx, lx, ly, bbox))
 
-        if within_page_row == 0:
-            crop_top = False
-        else:
-            crop_top = True
-
-        cropped_page = page
-        
-        # Apply cropping based on position
-        if crop_top:
-            cropped_page.mediabox.upper_right = (
-                cropped_page.mediabox.upper_right[0],
-                cropped_page.mediabox.upper_right[1] - crop_t_pt
-            )
-        if crop_bottom:
-            cropped_page.mediabox.lower_left = (
-                cropped_page.mediabox.lower_left[0],
-                cropped_page.mediabox.lower_left[1] + crop_b_pt
-            )
-        if crop_left:
-            cropped_page.mediabox.lower_left = (
-                cropped_page.mediabox.lower_left[0] + crop_l_pt,
-                cropped_page.mediabox.lower_left[1]
-            )
-        if crop_right:
-            cropped_page.mediabox.upper_right = (
-                cropped_page.mediabox.upper_right[0] - crop_r_pt,
-                cropped_page.mediabox.upper_right[1]
-            )
-        
-        # Place the cropped tile
-        target_page.merge_transformed_page(
-            cropped_page,
-            Transformation().translate(tx=lx, ty=ly)
-        )
+        # Place the cropped tiles
+        place_pages(writer, pages, tiles)
 
-    with open(dst, "wb") as fh:
-        writer.write(fh)
-    print(f"Wrote {dst}")
+        # Source pages often share fonts and images; write each distinct object once
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        with open(dst, "wb", buffering=1 << 20) as fh:
+            writer.write(fh)
+        print(f"Wrote {dst}")
 
 
 if __name__ == "__main__":
@@ -5,8 +5,14 @@ Convert an A0 file with live only pages into a full A0 file.
 import math
 import sys
 from pathlib import Path
+from typing import Dict, Tuple
 
-from pypdf import PdfReader, PdfWriter, Transformation
+from pypdf import PdfWriter
+
+try:
+    from ._placement import open_pdf, place_pages
+except ImportError:  # run as a script from this directory
+    from _placement import open_pdf, place_pages
 
 # constants
 MM2PT = 72 / 25.4
@@ -20,41 +26,40 @@ A0_H_PT = A4_expected_h * 4
 MARGIN_MM = 10
 MARGIN_PT = MARGIN_MM * MM2PT
 
-print(A4_expected_w - 2 * MARGIN_PT)
-print(A4_expected_h - 2 * MARGIN_PT)
-
 
 def main(src: Path, dst: Path) -> None:
-    reader = PdfReader(str(src))
-    num_pages = len(reader.pages)
-
-    writer = PdfWriter()
-    for _ in range(num_pages):
-        writer.add_blank_page(width=A0_W_PT, height=A0_H_PT)
-
-    for idx, page in enumerate(reader.pages):
-        tile_w = float(page.mediabox.width)
-        tile_h = float(page.mediabox.height)
-
-        print(f"Tile size: {tile_w} x {tile_h}")
-
-        if (A0_W_PT - tile_w) < (2 * MARGIN_PT) or (A0_H_PT - tile_h) < (2 * MARGIN_PT):
-            sys.exit(f"Original pages have dimensions {tile_w}pt x {tile_h}pt, which is too big to pad")
-        
-        new_w_margin = (A0_W_PT - tile_w) / 2
-        new_h_margin = (A0_H_PT - tile_h) / 2
-        
-        target_page = writer.pages[idx]
-
-        # Place the cropped tile
-        target_page.merge_transformed_page(
-            page,
-            Transformation().translate(tx=new_w_margin, ty=new_h_margin)
-        )
-
-    with open(dst, "wb") as fh:
-        writer.write(fh)
-    print(f"Wrote {dst}")
+    with open_pdf(src) as reader:
+        pages = list(reader.pages)
+        num_pages = len(pages)
+
+        # Validate every page before placing any of them. Padding only depends on
+        # the page size, which pages normally share, so compute it once per size.
+        sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in pages]
+        margins: Dict[Tuple[float, float], Tuple[float, float]] = {}
+        for tile_w, tile_h in dict.fromkeys(sizes):
+            print(f"Tile size: {tile_w} x {tile_h}")
+            margins[(tile_w, tile_h)] = ((A0_W_PT - tile_w) / 2, (A0_H_PT - tile_h) / 2)
+
+        bad = [idx for idx, (tile_w, tile_h) in enumerate(sizes) if (A0_W_PT - tile_w) < (2 * MARGIN_PT) or (A0_H_PT - tile_h) < (2 * MARGIN_PT)]
+        if bad:
+            tile_w, tile_h = sizes[bad[0]]
+            sys.exit(f"Original page {bad[0] + 1} has dimensions {tile_w}pt x {tile_h}pt, which is too big to pad")
+
+        writer = PdfWriter()
+        for _ in range(num_pages):
+            writer.add_blank_page(width=A0_W_PT, height=A0_H_PT)
+
+        # Centre each page on its own A0 sheet
+        place_pages(writer, pages, [
+            (idx, idx, *margins[size], page.cropbox)
+            for idx, (page, size) in enumerate(zip(pages, sizes))
+        ])
+
+        # Source pages often share fonts and images; write each distinct object once
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        with open(dst, "wb", buffering=1 << 20) as fh:
+            writer.write(fh)
+        print(f"Wrote {dst}")
 
 
 if __name__ == "__main__":